@@ -37,9 +37,9 @@ def run(args):
 
     out_configs = []
     ref_file = None
-    for i, (input_file, label) in enumerate(zip(args.inputs, args.labels)):
+    for i, (input_file, label) in enumerate(zip(args.input, args.labels)):
 
-        _, config = extract_and_flatten(input_file, args.output, label, prefix=i, reference_extracted=ref_file)
+        _, config = extract_and_flatten((input_file,), args.output, label, prefix=i, reference_extracted=ref_file)
         if not config:
             print(f"ERROR: Problem with input file {input_file}, cannot extract")
             return 1
@@ -9,10 +9,12 @@
 #
 
 import sys
+import re
 import argparse
 import importlib.util
 from os import environ, makedirs, remove
 from os.path import join, abspath, exists, dirname, basename, isfile
+from functools import lru_cache
 import json
 
 import numpy as np
@@ -38,20 +40,13 @@ spec.loader.exec_module(o2dpg_release_validation_utils)
 sys.modules["o2dpg_release_validation_utils"] = o2dpg_release_validation_utils
 import o2dpg_release_validation_utils as utils
 
-spec = importlib.util.spec_from_file_location("o2dpg_release_validation_plot", join(O2DPG_ROOT, "RelVal", "utils", 'o2dpg_release_validation_plot.py'))
-o2dpg_release_validation_plot = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(o2dpg_release_validation_plot)
-sys.modules["o2dpg_release_validation_plot"] = o2dpg_release_validation_plot
-from o2dpg_release_validation_plot import plot_pie_charts, plot_summary_grid, plot_compare_summaries, plot_overlays, plot_value_histograms
-
 
 ROOT_MACRO_EXTRACT=join(O2DPG_ROOT, "RelVal", "utils", "ExtractAndFlatten.C")
 ROOT_MACRO_RELVAL=join(O2DPG_ROOT, "RelVal", "utils", "ReleaseValidation.C")
 ROOT_MACRO_METRICS=join(O2DPG_ROOT, "RelVal", "utils", "ReleaseValidationMetrics.C")
 
-from ROOT import gROOT
-
-gROOT.SetBatch()
+# ReleaseValidationMetrics.C prints each metric name followed by a line telling whether or not it is enabled
+METRIC_STATUS_PATTERN = re.compile(rb"^METRIC: (\S+)$.*?^\s*--> (enabled|disabled)$", re.M | re.S)
 
 
 #############################################
@@ -70,18 +65,29 @@ def metrics_from_root():
     if ret > 0:
         return ret
 
-    with open(log_file_name, "r") as f:
-        current_metric = None
-        for line in f:
-            if current_metric is None and "METRIC" in line:
-                current_metric = line.split()[1]
-                continue
-            if "enabled" in line:
-                print(current_metric)
-                current_metric = None
+    with open(log_file_name, "rb") as f:
+        content = f.read()
+    for metric_name, status in METRIC_STATUS_PATTERN.findall(content):
+        if status == b"enabled":
+            print(metric_name.decode())
     return 0
 
 
+def load_plot():
+    """
+    Load the plotting module
+
+    This is only done when plots are requested since importing matplotlib, seaborn and scipy is expensive and not needed otherwise
+    """
+    if "o2dpg_release_validation_plot" in sys.modules:
+        return sys.modules["o2dpg_release_validation_plot"]
+    spec = importlib.util.spec_from_file_location("o2dpg_release_validation_plot", join(O2DPG_ROOT, "RelVal", "utils", 'o2dpg_release_validation_plot.py'))
+    o2dpg_release_validation_plot = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(o2dpg_release_validation_plot)
+    sys.modules["o2dpg_release_validation_plot"] = o2dpg_release_validation_plot
+    return o2dpg_release_validation_plot
+
+
 def load_from_meta_json(json_path):
     """
     Load a meta JSON file and return dictionary
@@ -89,11 +95,10 @@ def load_from_meta_json(json_path):
     if not exists(json_path):
         return None
 
-    with open(json_path, "r") as f:
-        try:
-            return json.load(f)
-        except (json.decoder.JSONDecodeError, UnicodeDecodeError):
-            pass
+    try:
+        return utils.read_json(json_path)
+    except (json.decoder.JSONDecodeError, UnicodeDecodeError):
+        pass
     return None
 
 
@@ -158,7 +163,8 @@ def extract_and_flatten_impl(input_filenames, target_filename, include_file_dire
     for f in input_filenames:
         f = abspath(f)
         print(f"  {f}")
-        cmd = f"\\(\\\"{f}\\\",\\\"{target_filename}\\\",\\\"{reference_extracted}\\\",\\\"{include_file_directories}\\\",\\\"{json_extracted}\\\"\\)"
+        # one ROOT process per file, the macro is not meant to be called repeatedly within the same process
+        cmd = f"\\(\\\"{f}\\\",\\\"{target_filename}\\\",\\\"{reference_extracted or ''}\\\",\\\"{include_file_directories}\\\",\\\"{json_extracted}\\\"\\)"
         cmd = f"root -l -b -q {ROOT_MACRO_EXTRACT}{cmd}"
         ret = utils.run_macro(cmd, log_file_name, cwd)
         if ret != 0:
@@ -191,14 +197,9 @@ def extract_and_flatten(files, output, label, include_directories=None, add_if_e
     if not extract_and_flatten_impl(files, root_out, include_file_directories=include_directories, add_if_exists=add_if_exists, reference_extracted=reference_extracted, json_extracted=json_out):
         return None, None
 
-    d = None
-    with open(json_out, "r") as f:
-        d = json.load(f)
-
+    d = utils.read_json(json_out)
     d["label"] = label
-
-    with open(json_out, "w") as f:
-        json.dump(d, f, indent=2)
+    utils.write_json(d, json_out, indent=True)
 
     return json_out, d
 
@@ -331,7 +332,7 @@ def initialise_evaluator(rel_val, thresholds_paths, thresholds_default, threshol
 
 
 def only_extract(args):
-    if not extract_and_flatten(args.input, args.output, None, args.label, args.reference)[0]:
+    if not extract_and_flatten(args.input, args.output, args.label, prefix=args.prefix, reference_extracted=args.reference)[0]:
         # checking one of the return values for None
         return 1
     return 0
@@ -418,17 +419,21 @@ def rel_val(args):
     # returned from RelVal match the condition of the filter function
     rel_val.filter_results(filter_on_interpretations)
     # if this comes from inspecting, there will be the annotations from the rel-val before that ==> re-write it
-    rel_val.write(join(args.output, "Summary.json"), annotations=annotations or rel_val.annotations[0])
+    rel_val.write(join(args.output, "Summary.json"), annotations=annotations or rel_val.annotations[0], indent=args.json_indent)
 
     utils.print_summary(rel_val, variables.REL_VAL_SEVERITIES, long=args.print_long)
 
     if not args.no_plot:
         print("Now plotting...")
-        # plot various different figures for user inspection
-        plot_pie_charts(rel_val, variables.REL_VAL_SEVERITIES, variables.REL_VAL_SEVERITY_COLOR_MAP, args.output)
-        plot_compare_summaries((rel_val,), args.output)
-        plot_summary_grid(rel_val, variables.REL_VAL_SEVERITIES, variables.REL_VAL_SEVERITY_COLOR_MAP, args.output)
-        plot_value_histograms(rel_val, args.output)
+        # plot various different figures for user inspection; they are independent of one another so do it in parallel
+        plot = load_plot()
+        n_failed = plot.plot_parallel(((plot.plot_pie_charts, (rel_val, variables.REL_VAL_SEVERITIES, variables.REL_VAL_SEVERITY_COLOR_MAP, args.output)),
+                                       (plot.plot_compare_summaries, ((rel_val,), args.output)),
+                                       (plot.plot_summary_grid, (rel_val, variables.REL_VAL_SEVERITIES, variables.REL_VAL_SEVERITY_COLOR_MAP, args.output)),
+                                       (plot.plot_value_histograms, (rel_val, args.output))))
+        if n_failed:
+            # still try to produce the overlays, they do not depend on the other plots
+            print(f"ERROR: {n_failed} of the plotting steps failed")
 
         if is_inspect:
             if annotations_inspect := rel_val.annotations:
@@ -440,7 +445,10 @@ def rel_val(args):
             overlay_plots_out = join(args.output, "overlayPlots")
             if not exists(overlay_plots_out):
                 makedirs(overlay_plots_out)
-            plot_overlays(rel_val, dict_1, dict_2, overlay_plots_out)
+            plot.plot_overlays(rel_val, dict_1, dict_2, overlay_plots_out)
+
+        if n_failed:
+            return 1
 
     return 0
 
@@ -468,13 +476,15 @@ def compare(args):
         for test_name in test_names:
             object_names1, results1 = rel_val1.get_result_per_metric_and_test(metric_name, test_name)
             object_names2, results2 = rel_val2.get_result_per_metric_and_test(metric_name, test_name)
+            results_interpretations1 = utils.get_interpretations(results1)
+            results_interpretations2 = utils.get_interpretations(results2)
 
             for interpretation in variables.REL_VAL_SEVERITIES:
                 if args.interpretations and interpretation not in args.interpretations:
                     continue
                 # object names of Results matching an interpretation
-                object_names_interpretation1 = object_names1[utils.count_interpretations(results1, interpretation)]
-                object_names_interpretation2 = object_names2[utils.count_interpretations(results2, interpretation)]
+                object_names_interpretation1 = object_names1[results_interpretations1 == interpretation]
+                object_names_interpretation2 = object_names2[results_interpretations2 == interpretation]
                 # elements in 1 that are not in 2...
                 only_in1 = np.setdiff1d(object_names_interpretation1, object_names_interpretation2)
                 # ...and the other way round
@@ -493,7 +503,7 @@ def compare(args):
     if args.plot:
         if not exists(output_dir):
             makedirs(output_dir)
-        plot_compare_summaries((rel_val1, rel_val2), output_dir, labels=args.labels)
+        load_plot().plot_compare_summaries((rel_val1, rel_val2), output_dir, labels=args.labels)
 
     return 0
 
@@ -521,15 +531,19 @@ def influx(args):
     # always the same
     row_tags = table_name + tags_out
 
+    severity_map = variables.REL_VAL_SEVERITY_MAP
+    lines = []
+    object_names, metric_names, result_names, results = rel_val.query_results()
+    for i, (object_name, metric_name, result_name, result) in enumerate(zip(object_names, metric_names, result_names, results)):
+        common_string = f"{row_tags},id={i},histogram_name={object_name},metric_name={metric_name},test_name={result_name} status={severity_map[result.interpretation]}"
+        if result.value is not None:
+            common_string += f",value={result.value}"
+        if result.mean is not None:
+            common_string += f",threshold={result.mean}"
+        lines.append(common_string)
+
     with open(output_path, "w") as f:
-        object_names, metric_names, result_names, results = rel_val.query_results()
-        for i, (object_name, metric_name, result_name, result) in enumerate(zip(object_names, metric_names, result_names, results)):
-            common_string = f"{row_tags},id={i},histogram_name={object_name},metric_name={metric_name},test_name={result_name} status={variables.REL_VAL_SEVERITY_MAP[result.interpretation]}"
-            if result.value is not None:
-                common_string += f",value={result.value}"
-            if result.mean is not None:
-                common_string += f",threshold={result.mean}"
-            f.write(f"{common_string}\n")
+        f.writelines(f"{line}\n" for line in lines)
     return 0
 
 
@@ -577,100 +591,167 @@ def print_header():
     print(f"\n{'#' * 25}\n#{' ' * 23}#\n# RUN ReleaseValidation #\n#{' ' * 23}#\n{'#' * 25}\n")
 
 
-################################################################
-# define the parser globally so that it could even be imported #
-################################################################
-
-# common parser for digesting input files
-COMMON_FILE_PARSER = argparse.ArgumentParser(add_help=False)
-COMMON_FILE_PARSER.add_argument("-i", "--input1", nargs="*", help="EITHER first set of input files for comparison OR first input directory from simulation for comparison", required=True)
-COMMON_FILE_PARSER.add_argument("-j", "--input2", nargs="*", help="EITHER second set of input files for comparison OR second input directory from simulation for comparison", required=True)
-COMMON_FILE_PARSER.add_argument("--labels", nargs=2, help="labels you want to appear in the plot legends in case of overlay plots from batches -i and -j", default=("batch_i", "batch_j"))
-COMMON_FILE_PARSER.add_argument("--no-extract", dest="no_extract", action="store_true", help="no extraction but immediately expect histograms present for comparison")
-
-# common parser digesting options related to thresholds
-COMMON_THRESHOLD_PARSER = argparse.ArgumentParser(add_help=False)
-COMMON_THRESHOLD_PARSER.add_argument("--regions", help="Use calculated regions to test status")
-COMMON_THRESHOLD_PARSER.add_argument("--default-threshold", dest="default_threshold", action="append", nargs=2)
-COMMON_THRESHOLD_PARSER.add_argument("--use-values-as-thresholds", nargs="*", dest="use_values_as_thresholds", help="Use values from another run as thresholds for this one")
-COMMON_THRESHOLD_PARSER.add_argument("--combine-thresholds", dest="combine_thresholds",  choices=["mean", "extreme"], help="Arithmetic mean or extreme value is chosen as threshold", default="mean")
-COMMON_THRESHOLD_PARSER.add_argument("--margin-threshold", dest="margin_threshold", action="append", nargs=2)
-
-# common parser to digest metric options
-COMMON_METRIC_PARSER = argparse.ArgumentParser(add_help=False)
-COMMON_METRIC_PARSER.add_argument("--enable-metric", dest="enable_metric", nargs="*")
-COMMON_METRIC_PARSER.add_argument("--disable-metric", dest="disable_metric", nargs="*")
-
-# common parser to digest object name patterns
-COMMON_PATTERN_PARSER = argparse.ArgumentParser(add_help=False)
-COMMON_PATTERN_PARSER.add_argument("--include-patterns", dest="include_patterns", nargs="*", help="include objects whose name includes at least one of the given patterns (takes precedence)")
-COMMON_PATTERN_PARSER.add_argument("--exclude-patterns", dest="exclude_patterns", nargs="*", help="exclude objects whose name includes at least one of the given patterns")
-
-# common parser to digest options related to interpretations
-COMMON_FLAGS_PARSER = argparse.ArgumentParser(add_help=False)
-COMMON_FLAGS_PARSER.add_argument("--interpretations", nargs="*", help="extract all objects which have at least one test with this severity flag", choices=list(variables.REL_VAL_SEVERITY_MAP.keys()))
-COMMON_FLAGS_PARSER.add_argument("--is-critical", dest="is_critical", nargs="*", help="set names of metrics that are assumed to be critical")
-
-# common parser to handle verbosity
-COMMON_VERBOSITY_PARSER = argparse.ArgumentParser(add_help=False)
-COMMON_VERBOSITY_PARSER.add_argument("--print-long", dest="print_long", action="store_true", help="enhance verbosity")
-COMMON_VERBOSITY_PARSER.add_argument("--no-plot", dest="no_plot", action="store_true", help="suppress plotting")
-
-# The main parser
-PARSER = argparse.ArgumentParser(description='Wrapping ReleaseValidation macro')
-
-# Use various sub-parsers
-SUB_PARSERS = PARSER.add_subparsers(dest="command")
-
-# rel-val
-REL_VAL_PARSER = SUB_PARSERS.add_parser("rel-val", parents=[COMMON_FILE_PARSER, COMMON_METRIC_PARSER, COMMON_THRESHOLD_PARSER, COMMON_FLAGS_PARSER, COMMON_VERBOSITY_PARSER])
-REL_VAL_PARSER.add_argument("--include-dirs", dest="include_dirs", nargs="*", help="only include desired directories inside ROOT file; note that each pattern is assumed to start in the top-directory (at the moment no regex or *)")
-REL_VAL_PARSER.add_argument("--add", action="store_true", help="If given and there is already a RelVal in the output directory, extracted objects will be added to the existing ones")
-REL_VAL_PARSER.add_argument("--output", "-o", help="output directory", default="rel_val")
-REL_VAL_PARSER.set_defaults(func=rel_val)
-
-# inspect
-INSPECT_PARSER = SUB_PARSERS.add_parser("inspect", parents=[COMMON_THRESHOLD_PARSER, COMMON_METRIC_PARSER, COMMON_PATTERN_PARSER, COMMON_FLAGS_PARSER, COMMON_VERBOSITY_PARSER])
-INSPECT_PARSER.add_argument("--path", dest="json_path", help="either complete file path to a Summary.json or directory where one of the former is expected to be", required=True)
-INSPECT_PARSER.add_argument("--output", "-o", help="output directory", default="rel_val_inspect")
-INSPECT_PARSER.set_defaults(func=rel_val)
-
-# compare
-COMPARE_PARSER = SUB_PARSERS.add_parser("compare", parents=[COMMON_FILE_PARSER, COMMON_PATTERN_PARSER, COMMON_METRIC_PARSER, COMMON_VERBOSITY_PARSER, COMMON_FLAGS_PARSER])
-COMPARE_PARSER.add_argument("--output", "-o", help="output directory", default="rel_val_comparison")
-COMPARE_PARSER.add_argument("--difference", action="store_true", help="plot histograms with different severity")
-COMPARE_PARSER.add_argument("--plot", action="store_true", help="plot value and threshold comparisons of RelVals")
-COMPARE_PARSER.set_defaults(func=compare)
-
-# influx
-INFLUX_PARSER = SUB_PARSERS.add_parser("influx")
-INFLUX_PARSER.add_argument("--path", help="directory where ReleaseValidation was run", required=True)
-INFLUX_PARSER.add_argument("--tags", nargs="*", help="tags to be added for influx, list of key=value")
-INFLUX_PARSER.add_argument("--table-suffix", dest="table_suffix", help="prefix for table name")
-INFLUX_PARSER.add_argument("--output", "-o", help="output path; if not given, a file influxDB.dat is places inside the RelVal directory")
-INFLUX_PARSER.set_defaults(func=influx)
-
-# print
-PRINT_PARSER = SUB_PARSERS.add_parser("print", parents=[COMMON_METRIC_PARSER, COMMON_PATTERN_PARSER, COMMON_FLAGS_PARSER])
-PRINT_PARSER.add_argument("--path", help="either complete file path to a Summary.json or directory where one of the former is expected to be")
-PRINT_PARSER.add_argument("--metric-names", dest="metric_names", action="store_true")
-PRINT_PARSER.add_argument("--test-names", dest="test_names", action="store_true")
-PRINT_PARSER.add_argument("--object-names", dest="object_names", action="store_true")
-PRINT_PARSER.set_defaults(func=print_simple)
-
-# extract
-EXTRACT_PARSER = SUB_PARSERS.add_parser("extract", parents=[COMMON_VERBOSITY_PARSER])
-EXTRACT_PARSER.add_argument("--input", nargs="*", help="Set of input files to be extracted", required=True)
-EXTRACT_PARSER.add_argument("--output", "-o", help="output directory", default="rel_val_extracted")
-EXTRACT_PARSER.add_argument("--prefix", "-p", help="prefix to prepend to output files")
-EXTRACT_PARSER.add_argument("--label", "-l", help="label to be assigned", required=True)
-EXTRACT_PARSER.add_argument("--reference", "-r", help="path to a reference extraction file (useful to have same binning when TTrees are extracted)")
-EXTRACT_PARSER.set_defaults(func=only_extract)
+###########################################################################
+# define the parser via functions so that only what is needed gets built #
+###########################################################################
+
+@lru_cache(maxsize=None)
+def make_common_file_parser():
+    """
+    common parser for digesting input files
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("-i", "--input1", nargs="*", help="EITHER first set of input files for comparison OR first input directory from simulation for comparison", required=True)
+    parser.add_argument("-j", "--input2", nargs="*", help="EITHER second set of input files for comparison OR second input directory from simulation for comparison", required=True)
+    parser.add_argument("--labels", nargs=2, help="labels you want to appear in the plot legends in case of overlay plots from batches -i and -j", default=("batch_i", "batch_j"))
+    parser.add_argument("--no-extract", dest="no_extract", action="store_true", help="no extraction but immediately expect histograms present for comparison")
+    return parser
+
+
+@lru_cache(maxsize=None)
+def make_common_threshold_parser():
+    """
+    common parser digesting options related to thresholds
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--regions", help="Use calculated regions to test status")
+    parser.add_argument("--default-threshold", dest="default_threshold", action="append", nargs=2)
+    parser.add_argument("--use-values-as-thresholds", nargs="*", dest="use_values_as_thresholds", help="Use values from another run as thresholds for this one")
+    parser.add_argument("--combine-thresholds", dest="combine_thresholds",  choices=["mean", "extreme"], help="Arithmetic mean or extreme value is chosen as threshold", default="mean")
+    parser.add_argument("--margin-threshold", dest="margin_threshold", action="append", nargs=2)
+    return parser
+
+
+@lru_cache(maxsize=None)
+def make_common_metric_parser():
+    """
+    common parser to digest metric options
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--enable-metric", dest="enable_metric", nargs="*")
+    parser.add_argument("--disable-metric", dest="disable_metric", nargs="*")
+    return parser
+
+
+@lru_cache(maxsize=None)
+def make_common_pattern_parser():
+    """
+    common parser to digest object name patterns
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--include-patterns", dest="include_patterns", nargs="*", help="include objects whose name includes at least one of the given patterns (takes precedence)")
+    parser.add_argument("--exclude-patterns", dest="exclude_patterns", nargs="*", help="exclude objects whose name includes at least one of the given patterns")
+    return parser
+
+
+@lru_cache(maxsize=None)
+def make_common_flags_parser():
+    """
+    common parser to digest options related to interpretations
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--interpretations", nargs="*", help="extract all objects which have at least one test with this severity flag", choices=list(variables.REL_VAL_SEVERITY_MAP.keys()))
+    parser.add_argument("--is-critical", dest="is_critical", nargs="*", help="set names of metrics that are assumed to be critical")
+    return parser
+
+
+@lru_cache(maxsize=None)
+def make_common_verbosity_parser():
+    """
+    common parser to handle verbosity
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--print-long", dest="print_long", action="store_true", help="enhance verbosity")
+    parser.add_argument("--no-plot", dest="no_plot", action="store_true", help="suppress plotting")
+    return parser
+
+
+def add_rel_val_parser(sub_parsers):
+    parser = sub_parsers.add_parser("rel-val", parents=[make_common_file_parser(), make_common_metric_parser(), make_common_threshold_parser(), make_common_flags_parser(), make_common_verbosity_parser()])
+    parser.add_argument("--include-dirs", dest="include_dirs", nargs="*", help="only include desired directories inside ROOT file; note that each pattern is assumed to start in the top-directory (at the moment no regex or *)")
+    parser.add_argument("--add", action="store_true", help="If given and there is already a RelVal in the output directory, extracted objects will be added to the existing ones")
+    parser.add_argument("--output", "-o", help="output directory", default="rel_val")
+    parser.add_argument("--json-indent", dest="json_indent", action="store_true", help="write the Summary.json indented to be human-readable instead of compact")
+    parser.set_defaults(func=rel_val)
+
+
+def add_inspect_parser(sub_parsers):
+    parser = sub_parsers.add_parser("inspect", parents=[make_common_threshold_parser(), make_common_metric_parser(), make_common_pattern_parser(), make_common_flags_parser(), make_common_verbosity_parser()])
+    parser.add_argument("--path", dest="json_path", help="either complete file path to a Summary.json or directory where one of the former is expected to be", required=True)
+    parser.add_argument("--output", "-o", help="output directory", default="rel_val_inspect")
+    parser.add_argument("--json-indent", dest="json_indent", action="store_true", help="write the Summary.json indented to be human-readable instead of compact")
+    parser.set_defaults(func=rel_val)
+
+
+def add_compare_parser(sub_parsers):
+    parser = sub_parsers.add_parser("compare", parents=[make_common_file_parser(), make_common_pattern_parser(), make_common_metric_parser(), make_common_verbosity_parser(), make_common_flags_parser()])
+    parser.add_argument("--output", "-o", help="output directory", default="rel_val_comparison")
+    parser.add_argument("--difference", action="store_true", help="plot histograms with different severity")
+    parser.add_argument("--plot", action="store_true", help="plot value and threshold comparisons of RelVals")
+    parser.set_defaults(func=compare)
+
+
+def add_influx_parser(sub_parsers):
+    parser = sub_parsers.add_parser("influx")
+    parser.add_argument("--path", help="directory where ReleaseValidation was run", required=True)
+    parser.add_argument("--tags", nargs="*", help="tags to be added for influx, list of key=value")
+    parser.add_argument("--table-suffix", dest="table_suffix", help="prefix for table name")
+    parser.add_argument("--output", "-o", help="output path; if not given, a file influxDB.dat is places inside the RelVal directory")
+    parser.set_defaults(func=influx)
+
+
+def add_print_parser(sub_parsers):
+    parser = sub_parsers.add_parser("print", parents=[make_common_metric_parser(), make_common_pattern_parser(), make_common_flags_parser()])
+    parser.add_argument("--path", help="either complete file path to a Summary.json or directory where one of the former is expected to be")
+    parser.add_argument("--metric-names", dest="metric_names", action="store_true")
+    parser.add_argument("--test-names", dest="test_names", action="store_true")
+    parser.add_argument("--object-names", dest="object_names", action="store_true")
+    parser.set_defaults(func=print_simple)
+
+
+def add_extract_parser(sub_parsers):
+    parser = sub_parsers.add_parser("extract", parents=[make_common_verbosity_parser()])
+    parser.add_argument("--input", nargs="*", help="Set of input files to be extracted", required=True)
+    parser.add_argument("--output", "-o", help="output directory", default="rel_val_extracted")
+    parser.add_argument("--prefix", "-p", help="prefix to prepend to output files")
+    parser.add_argument("--label", "-l", help="label to be assigned", required=True)
+    parser.add_argument("--reference", "-r", help="path to a reference extraction file (useful to have same binning when TTrees are extracted)")
+    parser.set_defaults(func=only_extract)
+
+
+# map the sub-commands to the functions adding the corresponding sub-parsers
+SUB_PARSER_BUILDERS = {"rel-val": add_rel_val_parser,
+                       "inspect": add_inspect_parser,
+                       "compare": add_compare_parser,
+                       "influx": add_influx_parser,
+                       "print": add_print_parser,
+                       "extract": add_extract_parser}
+
+
+@lru_cache(maxsize=None)
+def make_parser(commands=None):
+    """
+    Make the main parser
+
+    Parsers are cached, so repeated calls (e.g. when main() is called multiple times from Python) do not build them again.
+
+    Args:
+        commands: tuple or None
+            names of sub-commands to add sub-parsers for; if None, all of them are added
+    """
+    parser = argparse.ArgumentParser(description='Wrapping ReleaseValidation macro')
+    sub_parsers = parser.add_subparsers(dest="command")
+    for command, add_sub_parser in SUB_PARSER_BUILDERS.items():
+        if commands is None or command in commands:
+            add_sub_parser(sub_parsers)
+    return parser
 
 
 def main():
     """entry point when run directly from command line"""
-    args = PARSER.parse_args()
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    # only build the sub-parser that is requested; build all of them otherwise, e.g. for the top-level help or to report an unknown command
+    args = make_parser((command,) if command in SUB_PARSER_BUILDERS else None).parse_args()
     if args.command != "print":
         print_header()
     return(args.func(args))
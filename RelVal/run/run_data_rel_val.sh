@@ -124,8 +124,17 @@ AOD_RET=0
 mkdir ${OUTPUT} 2>/dev/null
 echo "Do RelVal and output to ${OUTPUT}" | tee -a ${LOGFILE}
 
-[[ "${QC1}" != "" && "${QC2}" != "" ]] && { rel_val_qc ${QC1} ${QC2} ${LABEL1} ${LABEL2} ; QC_RET=${?} ; } || { echo "No QC RelVal" | tee -a ${LOGFILE} ; }
-[[ "${AOD1}" != "" && "${AOD2}" != "" ]] && { rel_val_aod ${AOD1} ${AOD2} ${LABEL1} ${LABEL2} ; AOD_RET=${?} ; } || { echo "No AOD RelVal" | tee -a ${LOGFILE} ; }
+# QC and AOD RelVals are independent of each other, run them in parallel and collect their return codes afterwards
+# each of them logs to its own file which is appended to the main log file when done so that the output is not interleaved
+QC_PID=
+AOD_PID=
+QC_LOGFILE=${OUTPUT}/QC.log
+AOD_LOGFILE=${OUTPUT}/AOD.log
+rm ${QC_LOGFILE} ${AOD_LOGFILE} 2>/dev/null
+[[ "${QC1}" != "" && "${QC2}" != "" ]] && { ( LOGFILE=${QC_LOGFILE} ; rel_val_qc ${QC1} ${QC2} ${LABEL1} ${LABEL2} ) & QC_PID=${!} ; } || { echo "No QC RelVal" | tee -a ${LOGFILE} ; }
+[[ "${AOD1}" != "" && "${AOD2}" != "" ]] && { ( LOGFILE=${AOD_LOGFILE} ; rel_val_aod ${AOD1} ${AOD2} ${LABEL1} ${LABEL2} ) & AOD_PID=${!} ; } || { echo "No AOD RelVal" | tee -a ${LOGFILE} ; }
+[[ "${QC_PID}" != "" ]] && { wait ${QC_PID} ; QC_RET=${?} ; cat ${QC_LOGFILE} >> ${LOGFILE} ; }
+[[ "${AOD_PID}" != "" ]] && { wait ${AOD_PID} ; AOD_RET=${?} ; cat ${AOD_LOGFILE} >> ${LOGFILE} ; }
 
 RET=$((QC_RET + AOD_RET))
 echo "Exit with ${RET}" | tee -a ${LOGFILE}
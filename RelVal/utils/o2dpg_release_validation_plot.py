@@ -7,7 +7,12 @@ from os.path import join
 from os import environ
 import importlib.util
 from itertools import product
+from multiprocessing import get_context, get_all_start_methods
+import traceback
 import numpy as np
+import matplotlib
+# we only write figures to files, so use the non-interactive backend
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
 import seaborn
@@ -19,13 +24,17 @@ spec = importlib.util.spec_from_file_location("o2dpg_release_validation_utils",
 o2dpg_release_validation_utils = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(o2dpg_release_validation_utils)
 sys.modules["o2dpg_release_validation_utils"] = o2dpg_release_validation_utils
-from o2dpg_release_validation_utils import count_interpretations
+from o2dpg_release_validation_utils import get_interpretations
 
-spec = importlib.util.spec_from_file_location("o2dpg_release_validation_plot_root", join(O2DPG_ROOT, "RelVal", "utils", '.', 'o2dpg_release_validation_plot_root.py'))
-o2dpg_release_validation_plot_root = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(o2dpg_release_validation_plot_root)
-sys.modules["o2dpg_release_validation_plot_root"] = o2dpg_release_validation_plot_root
-from o2dpg_release_validation_plot_root import plot_overlays_root, plot_overlays_root_no_rel_val
+# cheaper rendering of lines with many points
+plt.rcParams["path.simplify"] = True
+plt.rcParams["agg.path.chunksize"] = 10000
+
+# maximum number of object names to put as tick labels along an axis
+MAX_TICK_LABELS = 50
+
+# maximum number of plotting processes running at the same time, kept small since multiple RelVals might run in parallel
+MAX_PLOT_PROCESSES = 2
 
 
 def plot_pie_charts(rel_val, interpretations, interpretation_colors, out_dir, title="", get_figure=False):
@@ -35,8 +44,9 @@ def plot_pie_charts(rel_val, interpretations, interpretation_colors, out_dir, ti
     Each pie chart shows the ratio of given interpretations
     """
     print("==> Plot pie charts <==")
+    # the same figure is cleared and re-used for all pie charts
+    figure = plt.figure(figsize=(20, 20))
     for metric_name, test_name in product(rel_val.known_metrics, rel_val.known_test_names):
-        figure, ax = plt.subplots(figsize=(20, 20))
         # collect counts of interpretations, their colours and labels
         counts = []
         colors = []
@@ -46,24 +56,26 @@ def plot_pie_charts(rel_val, interpretations, interpretation_colors, out_dir, ti
         if not len(object_names):
             continue
 
+        results_interpretations = get_interpretations(results)
         for interpretation in interpretations:
-            n_objects = len(object_names[count_interpretations(results, interpretation)])
+            n_objects = np.count_nonzero(results_interpretations == interpretation)
             if not n_objects:
                 continue
             counts.append(n_objects)
             colors.append(interpretation_colors[interpretation])
             labels.append(interpretation)
 
+        figure.clear()
+        ax = figure.add_subplot()
         ax.pie(counts, explode=[0.05 for _ in counts], labels=labels, autopct="%1.1f%%", startangle=90, textprops={"fontsize": 30}, colors=colors)
         ax.axis("equal")
-        ax.axis("equal")
 
         figure.suptitle(f"{title} (metric: {metric_name}, test: {test_name})", fontsize=40)
         save_path = join(out_dir, f"pie_chart_{metric_name}_{test_name}.png")
         figure.savefig(save_path)
         if get_figure:
             return figure
-        plt.close(figure)
+    plt.close(figure)
 
 
 def plot_value_histograms(rel_val, out_dir, title="values histogram", get_figure=False):
@@ -72,8 +84,9 @@ def plot_value_histograms(rel_val, out_dir, title="values histogram", get_figure
     """
 
     print("==> Plot value histograms <==")
+    # the same figure is cleared and re-used for all histograms
+    figure = plt.figure(figsize=(20, 20))
     for metric_name in rel_val.known_metrics:
-        figure, ax = plt.subplots(figsize=(20, 20))
         values = []
         for _, _, metric in zip(*rel_val.get_metrics(metric_name=metric_name)):
             if not metric.comparable:
@@ -83,6 +96,8 @@ def plot_value_histograms(rel_val, out_dir, title="values histogram", get_figure
         if not values:
             continue
 
+        figure.clear()
+        ax = figure.add_subplot()
         ax.set_xlabel(metric_name, fontsize=20)
         ax.set_ylabel("counts", fontsize=20)
         ax.hist(values, bins=100)
@@ -94,7 +109,7 @@ def plot_value_histograms(rel_val, out_dir, title="values histogram", get_figure
         figure.savefig(save_path)
         if get_figure:
             return figure
-        plt.close(figure)
+    plt.close(figure)
 
 
 def plot_summary_grid(rel_val, interpretations, interpretation_colors, output_dir, get_figure=False):
@@ -171,26 +186,30 @@ def plot_compare_summaries(rel_vals, out_dir, *, labels=None, get_figure=False):
     if not labels:
         labels = [f"summary_{i}" for i, _ in enumerate(rel_vals)]
 
-    test_names = list(rel_vals[0].known_test_names)
-    metric_names = list(rel_vals[0].known_metrics)
-    for rel_val in rel_vals[1:]:
-        test_names = list(set(test_names + list(rel_val.known_test_names)))
-        metric_names = list(set(metric_names + list(rel_val.known_metrics)))
+    # collect all test and metric names in one go
+    test_names = sorted(set().union(*(rel_val.known_test_names for rel_val in rel_vals)))
+    metric_names = sorted(set().union(*(rel_val.known_metrics for rel_val in rel_vals)))
 
     for metric_name, test_name in product(metric_names, test_names):
         figure, ax = plt.subplots(figsize=(20, 20))
-        plot_this = False
+        # object names in the order they are placed along the categorical x-axis
+        plotted_object_names = {}
         for rel_val, label in zip(rel_vals, labels):
             object_names, results = rel_val.get_result_per_metric_and_test(metric_name, test_name)
             values = [result.value for result in results]
             means = [result.mean for result in results]
             if not values:
                 continue
-            plot_this = True
+            plotted_object_names.update(dict.fromkeys(object_names))
             ax.plot(object_names, values, label=f"values_{label}")
             ax.plot(object_names, means, label=f"test_means_{label}")
-        if not plot_this:
+        if not plotted_object_names:
+            plt.close(figure)
             continue
+        # label only a subset of objects, laying out thousands of tick labels is very slow and not readable anyway
+        plotted_object_names = list(plotted_object_names)
+        step = max(1, len(plotted_object_names) // MAX_TICK_LABELS)
+        ax.set_xticks(range(0, len(plotted_object_names), step), plotted_object_names[::step])
         ax.legend(loc="best", fontsize=20)
         ax.tick_params("both", labelsize=20)
         ax.tick_params("x", rotation=90)
@@ -205,12 +224,88 @@ def plot_compare_summaries(rel_vals, out_dir, *, labels=None, get_figure=False):
         return figures
 
 
+def plot_sequential(funcs_args):
+    """
+    Run plotting functions one after the other
+
+    Args:
+        funcs_args: iterable of 2-tuples
+            each tuple holds a plotting function and a tuple of its arguments
+    Returns:
+        int: number of plotting functions that failed
+    """
+    n_failed = 0
+    for func, args in funcs_args:
+        try:
+            func(*args)
+        except Exception:
+            traceback.print_exc()
+            n_failed += 1
+    return n_failed
+
+
+def plot_parallel(funcs_args):
+    """
+    Run independent plotting functions in parallel
+
+    Falls back to running them sequentially where forking is not available or not safe.
+
+    Args:
+        funcs_args: iterable of 2-tuples
+            each tuple holds a plotting function and a tuple of its arguments
+    Returns:
+        int: number of plotting functions that failed
+    """
+    if not sys.platform.startswith("linux") or "fork" not in get_all_start_methods():
+        # e.g. on macOS forking is not safe, in particular after ROOT has been loaded
+        return plot_sequential(funcs_args)
+
+    # only available on Linux
+    from os import sched_getaffinity
+    n_processes = min(MAX_PLOT_PROCESSES, len(sched_getaffinity(0)))
+    if n_processes < 2:
+        return plot_sequential(funcs_args)
+
+    # fork so that the (potentially large) RelVal objects do not need to be pickled
+    context = get_context("fork")
+    n_failed = 0
+    running = []
+    for func, args in funcs_args:
+        if len(running) == n_processes:
+            # wait for the oldest one before starting the next
+            p = running.pop(0)
+            p.join()
+            n_failed += p.exitcode != 0
+        p = context.Process(target=func, args=args)
+        p.start()
+        running.append(p)
+    for p in running:
+        p.join()
+        n_failed += p.exitcode != 0
+    return n_failed
+
+
+def load_plot_root():
+    """
+    Load the ROOT plotting module
+
+    This is only done when overlays are requested since importing ROOT is expensive and not needed otherwise
+    """
+    if "o2dpg_release_validation_plot_root" in sys.modules:
+        return sys.modules["o2dpg_release_validation_plot_root"]
+    spec = importlib.util.spec_from_file_location("o2dpg_release_validation_plot_root", join(O2DPG_ROOT, "RelVal", "utils", '.', 'o2dpg_release_validation_plot_root.py'))
+    o2dpg_release_validation_plot_root = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(o2dpg_release_validation_plot_root)
+    sys.modules["o2dpg_release_validation_plot_root"] = o2dpg_release_validation_plot_root
+    return o2dpg_release_validation_plot_root
+
+
 def plot_overlays(rel_val, file_config_map1, file_config_map2, out_dir, plot_regex=None):
     """
     Wrapper around ROOT overlay plotting
     """
     print("==> Plot overlays <==")
-    plot_overlays_root(rel_val, file_config_map1, file_config_map2, out_dir, plot_regex)
+    load_plot_root().plot_overlays_root(rel_val, file_config_map1, file_config_map2, out_dir, plot_regex)
 
 
 def plot_overlays_no_rel_val(file_configs, out_dir):
@@ -218,4 +313,4 @@ def plot_overlays_no_rel_val(file_configs, out_dir):
     Wrapper around ROOT plotting when no RelVal object is given
     """
     print("==> Plot overlays <==")
-    plot_overlays_root_no_rel_val(file_configs, out_dir)
+    load_plot_root().plot_overlays_root_no_rel_val(file_configs, out_dir)
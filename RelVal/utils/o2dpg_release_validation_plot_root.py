@@ -8,7 +8,9 @@ from math import log10, pow
 import re
 
 from ctypes import c_char_p
-from ROOT import gSystem, TFile, TCanvas, TPad, TLegend, TH2, TH3, TText, TPaveText, kWhite, kRed, kBlue, kGreen, kMagenta, kCyan, kOrange, kYellow, TProfile
+from ROOT import gROOT, gSystem, TFile, TCanvas, TPad, TLegend, TH2, TH3, TText, TPaveText, kWhite, kRed, kBlue, kGreen, kMagenta, kCyan, kOrange, kYellow, TProfile
+
+gROOT.SetBatch()
 
 
 def style_histograms(histograms):
@@ -91,6 +93,20 @@ def make_frame(pad, histograms):
     return frame, shouldBeLog
 
 
+def make_legend_labels(histograms, labels):
+    """
+    Make a legend with one entry per histogram and its label
+    """
+    legend_labels = TLegend(0.65, 0.7, 0.9, 0.9)
+    legend_labels.SetFillStyle(0)
+    legend_labels.SetBorderSize(0)
+    legend_labels.SetTextFont(43)
+    legend_labels.SetTextSize(20)
+    for h, label in zip(histograms, labels):
+        legend_labels.AddEntry(h, label)
+    return legend_labels
+
+
 def plot_single_overlay_1d(histograms, more_objects, out_path, *args):
 
     ratios = []
@@ -241,20 +257,10 @@ def plot_overlays_root(rel_val, file_config_map1, file_config_map2, out_dir, plo
             plot_func = plot_single_overlay_1d
             metrics_box.SetFillStyle(0)
             style_histograms([h1, h2])
-            legend_labels = TLegend(0.65, 0.7, 0.9, 0.9)
-            legend_labels.SetFillStyle(0)
-            legend_labels.SetBorderSize(0)
-            legend_labels.SetTextFont(43)
-            legend_labels.SetTextSize(20)
-            legend_labels.AddEntry(h1, label1)
-            legend_labels.AddEntry(h2, label2)
-            more_objects.append(legend_labels)
+            more_objects.append(make_legend_labels([h1, h2], [label1, label2]))
         else:
             metrics_box.SetFillColor(kWhite)
 
-        legend_metrics = TLegend(0.15, 0.7, 0.4, 0.9)
-        legend_metrics.SetBorderSize(0)
-        legend_metrics.SetFillStyle(0)
         for key, value in metric_legend_entries.items():
             metrics_box.AddText(f"{key} = {value}")
 
@@ -269,22 +275,23 @@ def plot_overlays_root(rel_val, file_config_map1, file_config_map2, out_dir, plo
 def plot_overlays_root_no_rel_val(file_configs, out_dir):
     gSystem.RedirectOutput(join(out_dir, "overlay_plotting.log"), "w")
 
-    all_names = []
+    all_names = set()
     labels = []
     files = []
     names_per_file = []
     for fc in file_configs:
-        all_names.extend(fc["objects"])
+        # build the set of names once per file so that membership checks below are O(1)
+        object_names = set(fc["objects"])
+        all_names.update(object_names)
         labels.append(fc["label"])
-        names_per_file.append(fc["objects"])
+        names_per_file.append(object_names)
         files.append(TFile(fc["path"], "READ"))
 
-    all_names = list(set(all_names))
-    for name in all_names:
+    for name in sorted(all_names):
         histograms = []
         current_labels = []
 
-        for object_names, label, f in zip(labels, files):
+        for object_names, label, f in zip(names_per_file, labels, files):
             if name not in object_names:
                 continue
             histograms.append(f.Get(name))
@@ -298,16 +305,9 @@ def plot_overlays_root_no_rel_val(file_configs, out_dir):
         if not isinstance(histograms[0], (TH2, TH3)):
             plot_func = plot_single_overlay_1d
             style_histograms(histograms)
-            legend_labels = TLegend(0.65, 0.7, 0.9, 0.9)
-            legend_labels.SetFillStyle(0)
-            legend_labels.SetBorderSize(0)
-            legend_labels.SetTextFont(43)
-            legend_labels.SetTextSize(20)
-            for h, cl in zip(histograms, current_labels):
-                legend_labels.AddEntry(h, cl)
-            more_objects.append(legend_labels)
+            more_objects.append(make_legend_labels(histograms, current_labels))
 
         out_path = join(out_dir, f"{name}.png")
-        plot_func(histograms, more_objects, out_path, labels)
+        plot_func(histograms, more_objects, out_path, current_labels)
 
     gSystem.RedirectOutput(c_char_p(0))
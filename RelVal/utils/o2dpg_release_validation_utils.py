@@ -4,14 +4,74 @@
 
 import re
 from os.path import join, exists, isdir, abspath
-from os import makedirs, rename
+from os import makedirs, rename, stat
 from shutil import rmtree, copy
 from itertools import product
-from subprocess import Popen, PIPE, STDOUT
+from subprocess import Popen, STDOUT
 from shlex import split
+from functools import lru_cache
 import json
 import numpy as np
 
+try:
+    import orjson
+    have_orjson = True
+except ImportError:
+    have_orjson = False
+
+
+def read_json(path):
+    """
+    Read a JSON file and return its content
+
+    Use orjson if available which is considerably faster for large files
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    if have_orjson:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson is stricter (e.g. it does not accept NaN), so give the standard library a chance
+            pass
+    return json.loads(content)
+
+
+# keep only a few parsed files alive, the content is converted into Metric/Result objects anyway
+@lru_cache(maxsize=4)
+def read_json_cached_impl(path, mtime, size):
+    """
+    Only to be used by read_json_cached, mtime and size are part of the cache key
+    """
+    return read_json(path)
+
+
+def read_json_cached(path):
+    """
+    Read a JSON file only once as long as it is not modified
+
+    The same summaries are often read multiple times, e.g. when they are used to derive thresholds and regions.
+    NOTE that the returned object is shared between calls and must not be modified.
+    """
+    path = abspath(path)
+    stat_result = stat(path)
+    return read_json_cached_impl(path, stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def write_json(obj, path, indent=False):
+    """
+    Write an object to a JSON file
+
+    By default, the output is compact; set indent to True to get human-readable output.
+    This always uses the standard library: orjson would write NaN and +-Inf as null while json writes NaN and Infinity,
+    and the content of the file must not depend on whether or not orjson is installed.
+    """
+    with open(path, "w") as f:
+        if indent:
+            json.dump(obj, f, indent=2)
+        else:
+            json.dump(obj, f, separators=(",", ":"))
+
 
 def default_evaluation(limits):
     """
@@ -148,7 +208,7 @@ class TestLimits:
         if n_sigmas == 0:
             n_sigmas = None
         elif n_sigmas is not None:
-            n_sigmas = abs(self.mean - value) / n_sigmas if n_sigmas != 0 else 0
+            n_sigmas = abs(self.mean - value) / n_sigmas
 
         # NOTE Here we want the test_function to directly return the test flag
         test_flag = self.test_function(value)
@@ -169,6 +229,8 @@ class Evaluator:
         self.test_names = []
         self.tests = []
         self.mask_any = None
+        # map (object_name, metric_name) to the indices of the tests registered for it
+        self.tests_idx = None
 
     def add_limits(self, object_name, metric_name, test_limits):
         self.object_names.append(object_name)
@@ -182,6 +244,9 @@ class Evaluator:
         self.test_names = np.array(self.test_names, dtype=str)
         self.tests = np.array(self.tests, dtype=TestLimits)
         self.mask_any = np.full(self.test_names.shape, True)
+        self.tests_idx = {}
+        for idx, key in enumerate(zip(self.object_names, self.metric_names)):
+            self.tests_idx.setdefault(key, []).append(idx)
 
     def test(self, metrics):
         """
@@ -193,12 +258,11 @@ class Evaluator:
         results = []
         return_metrics_idx = []
 
-        # probably there is a better way
         for idx, metric in enumerate(metrics):
-            mask = (self.object_names == metric.object_name) & (self.metric_names == metric.name)
-            if not np.any(mask):
+            tests_idx = self.tests_idx.get((metric.object_name, metric.name), None)
+            if not tests_idx:
                 continue
-            for t in self.tests[mask]:
+            for t in self.tests[tests_idx]:
                 return_metrics_idx.append(idx)
                 results.append(t.test(metric))
 
@@ -213,18 +277,22 @@ class RelVal:
 
     def __init__(self):
         # metric names that should be considered (if empty, all)
-        self.include_metrics = []
+        self.include_metrics = set()
         # metric names that should be excluded, takes precedence over self.include_metrics
-        self.exclude_metrics = []
-        # lists of regex to include/exclude objects by their names
+        self.exclude_metrics = set()
+        # compiled regex to include/exclude objects by their names
         self.include_patterns = None
         self.exclude_patterns = None
+        # cache decisions of consider_object, the same object name is checked many times (once per metric and result)
+        self.consider_object_cache = {}
 
         # collecting everything we have; the following three members will have the same length
         self.object_names = None
         self.metric_names = None
         # metric objects
         self.metrics = None
+        # map (object_name, metric_name) to the index in self.metrics, used to find known metrics quickly while loading
+        self.metrics_idx = None
 
         # unique object and metric names
         self.known_objects = None
@@ -247,10 +315,7 @@ class RelVal:
         """
         if not metric_names:
             return
-        for metric in metric_names:
-            if metric in self.include_metrics:
-                continue
-            self.include_metrics.append(metric)
+        self.include_metrics.update(metric_names)
 
     def disable_metrics(self, metric_names):
         """
@@ -258,10 +323,7 @@ class RelVal:
         """
         if not metric_names:
             return
-        for metric in metric_names:
-            if metric in self.exclude_metrics:
-                continue
-            self.exclude_metrics.append(metric)
+        self.exclude_metrics.update(metric_names)
 
     def consider_metric(self, metric_name):
         """
@@ -296,8 +358,15 @@ class RelVal:
                     patterns_from_file.append(line)
             return patterns_from_file
 
-        self.include_patterns = load_this_patterns(include_patterns)
-        self.exclude_patterns = load_this_patterns(exclude_patterns)
+        def compile_this_patterns(patterns):
+            if not patterns:
+                return None
+            return [re.compile(p) for p in patterns]
+
+        self.include_patterns = compile_this_patterns(load_this_patterns(include_patterns))
+        self.exclude_patterns = compile_this_patterns(load_this_patterns(exclude_patterns))
+        # patterns changed, previous decisions are not valid anymore
+        self.consider_object_cache = {}
 
     def consider_object(self, object_name):
         """
@@ -306,19 +375,23 @@ class RelVal:
         if not self.include_patterns and not self.exclude_patterns:
             return True
 
+        decision = self.consider_object_cache.get(object_name, None)
+        if decision is None:
+            decision = self.consider_object_impl(object_name)
+            self.consider_object_cache[object_name] = decision
+        return decision
+
+    def consider_object_impl(self, object_name):
+        """
+        do the actual regex matching for consider_object
+        """
         if self.include_patterns:
-            for ip in self.include_patterns:
-                if re.search(ip, object_name):
-                    return True
-            return False
+            return any(p.search(object_name) for p in self.include_patterns)
 
         # we can only reach this point if there are no include_patterns
         # that, in turn, means that there are exclude_patterns, cause otherwise
         # we would have returned in the very beginning
-        for ip in self.exclude_patterns:
-            if re.search(ip, object_name):
-                return False
-        return True
+        return not any(p.search(object_name) for p in self.exclude_patterns)
 
     @staticmethod
     def read(path_or_dict):
@@ -327,8 +400,7 @@ class RelVal:
         """
         if isinstance(path_or_dict, dict):
             return path_or_dict
-        with open(path_or_dict, "r") as f:
-            return json.load(f)
+        return read_json_cached(path_or_dict)
 
     def add_metric(self, metric):
         """
@@ -337,6 +409,7 @@ class RelVal:
         object_name = metric.object_name
         if not self.consider_object(object_name) or not self.consider_metric(metric.name):
             return False
+        self.metrics_idx[(object_name, metric.name)] = len(self.metrics)
         self.object_names.append(object_name)
         self.metric_names.append(metric.name)
         self.metrics.append(metric)
@@ -359,11 +432,11 @@ class RelVal:
 
         metric = Metric(in_dict=in_dict)
 
-        for idx, search_metric in enumerate(self.metrics):
-            if metric == search_metric:
-                return idx, search_metric
+        idx = self.metrics_idx.get((metric.object_name, metric.name), None)
+        if idx is None:
+            return None, metric
 
-        return None, metric
+        return idx, self.metrics[idx]
 
     def to_numpy(self):
         """
@@ -392,6 +465,7 @@ class RelVal:
         self.object_names = []
         self.metric_names = []
         self.metrics = []
+        self.metrics_idx = {}
         self.results_to_metrics_idx = []
         self.results = []
 
@@ -558,39 +632,30 @@ class RelVal:
             yield_results = results[mask] if results is not None else np.array([None] * len(yield_metrics))
             yield object_name, yield_metrics, yield_results
 
-    def write(self, filepath, annotations=None):
+    def write(self, filepath, annotations=None, indent=False):
         """
         Write everything to a JSON file
 
-        Structure corresponds to what ROOT's RelVal returns so in turn it can be used to construct a RelVal object again
+        Structure corresponds to what ROOT's RelVal returns so in turn it can be used to construct a RelVal object again.
+        The JSON is written compact unless indent is True.
         """
-        all_objects = []
-
-        def make_dict_include_results(object_name, metric, result):
-            return {RelVal.KEY_OBJECT_NAME: object_name} | metric.as_dict() | result.as_dict()
-
-        def make_dict_exclude_results(object_name, metric, *args):
-            return {RelVal.KEY_OBJECT_NAME: object_name} | metric.as_dict()
-
         if self.results is None:
-            object_names = self.object_names
-            metrics = self.metrics
-            results = np.empty(metrics.shape, dtype=bool)
-            make_dict = make_dict_exclude_results
+            all_objects = [metric.as_dict() for metric in self.metrics]
         else:
-            object_names = np.take(self.object_names, self.results_to_metrics_idx)
-            metrics = np.take(self.metrics, self.results_to_metrics_idx)
-            results = self.results
-            make_dict = make_dict_include_results
-
-        for object_name, metric, result in zip(object_names, metrics, results):
-            all_objects.append(make_dict(object_name, metric, result))
+            # a metric has usually several results, so build its dictionary only once
+            metric_dicts = [None] * len(self.metrics)
+            all_objects = []
+            for metric_idx, result in zip(self.results_to_metrics_idx, self.results):
+                metric_dict = metric_dicts[metric_idx]
+                if metric_dict is None:
+                    metric_dict = self.metrics[metric_idx].as_dict()
+                    metric_dicts[metric_idx] = metric_dict
+                all_objects.append(metric_dict | result.as_dict())
 
         final_dict = {RelVal.KEY_OBJECTS: all_objects,
                       RelVal.KEY_ANNOTATIONS: annotations}
 
-        with open(filepath, "w") as f:
-            json.dump(final_dict, f, indent=2)
+        write_json(final_dict, filepath, indent)
 
 
 def get_paths_or_from_file(paths):
@@ -707,22 +772,20 @@ def run_macro(cmd, log_file, cwd=None):
     """
     Wrapper to run a command line
     """
-    p = Popen(split(cmd), cwd=cwd, stdout=PIPE, stderr=STDOUT, universal_newlines=True)
-    # open a logfile and write to it line by line
-    log_file = open(log_file, 'a')
-    for line in p.stdout:
-        log_file.write(line)
-    p.wait()
-    # when done, close the logfile and return the cmd's return code
-    log_file.close()
+    with open(log_file, 'a') as f:
+        p = Popen(split(cmd), cwd=cwd, stdout=f, stderr=STDOUT)
+        p.wait()
+    # when done, return the cmd's return code
     return p.returncode
 
 
-def count_interpretations(results, interpretation):
+def get_interpretations(results):
     """
-    return indices where results have a certain interpretation
+    return the interpretations of results as numpy array
+
+    Useful to extract them once and compare against several interpretations afterwards
     """
-    return np.array([result.interpretation == interpretation for result in results], dtype=bool)
+    return np.array([result.interpretation for result in results], dtype=object)
 
 
 def print_summary(rel_val, interpretations, long=False):
@@ -734,8 +797,9 @@ def print_summary(rel_val, interpretations, long=False):
         for test_name in rel_val.known_test_names:
             object_names, results = rel_val.get_result_per_metric_and_test(metric_name, test_name)
             print(f"METRIC: {metric_name}, TEST: {test_name}")
+            results_interpretations = get_interpretations(results)
             for interpretation in interpretations:
-                object_names_interpretation = object_names[count_interpretations(results, interpretation)]
+                object_names_interpretation = object_names[results_interpretations == interpretation]
                 percent = len(object_names_interpretation) / rel_val.number_of_objects
                 print(f"  {interpretation}: {len(object_names_interpretation)} ({percent * 100:.2f}%)")
                 if long: